@@ -1,11 +1,25 @@
 import chess
 import chess.pgn
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 import pygame
 import logging
 from datetime import datetime
 import os
 import json
+from pathlib import Path
+
+try:
+    import orjson  # Optional: faster decoding of streamed Ollama responses
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+try:
+    import cairosvg  # Optional: rasterizes downloaded SVG pieces at the exact display size
+except ImportError:
+    cairosvg = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -17,41 +31,63 @@ WHITE = (240, 217, 181)
 BROWN = (181, 136, 99)
 HIGHLIGHT = (124, 252, 0, 128)  # Semi-transparent green for move highlights
 
+# Asset and saved game locations, resolved once at import
+_HERE = os.path.dirname(os.path.abspath(__file__))
+ASSETS_DIR = os.path.join(_HERE, "assets")
+GAMES_DIR = os.path.join(_HERE, "games")
+os.makedirs(ASSETS_DIR, exist_ok=True)
+os.makedirs(GAMES_DIR, exist_ok=True)
+
+# (piece symbol, image path) for all 12 pieces, e.g. ('N', '.../white_knight.png')
+_PIECE_NAMES = {'p': 'pawn', 'n': 'knight', 'b': 'bishop', 'r': 'rook', 'q': 'queen', 'k': 'king'}
+PIECE_FILES = tuple(
+    (symbol.upper() if color == 'white' else symbol, f"{ASSETS_DIR}/{color}_{name}.png")
+    for color in ('white', 'black')
+    for symbol, name in _PIECE_NAMES.items()
+)
+
+# Keep-alive session so every AI move reuses the connection to Ollama
+_OLLAMA_SESSION = requests.Session()
+_OLLAMA_SESSION.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+AI_MAX_TOKENS = 64  # Give up on a streamed AI response after this many tokens
+
 def download_chess_pieces():
     """Download chess piece images from Lichess."""
-    pieces = ['pawn', 'knight', 'bishop', 'rook', 'queen', 'king']
-    colors = ['white', 'black']
     base_url = "https://lichess1.org/assets/piece/cburnett/"
     
-    # Ensure assets directory exists
-    assets_dir = os.path.join(os.path.dirname(__file__), "assets")
-    if not os.path.exists(assets_dir):
-        os.makedirs(assets_dir)
-    
-    for color in colors:
-        for piece in pieces:
-            filename = f"{color}_{piece}.png"
-            filepath = os.path.join(assets_dir, filename)
+    def _fetch(session, symbol, filepath):
+        filename = os.path.basename(filepath)
+        
+        # Skip if file already exists
+        if os.path.exists(filepath):
+            return
             
-            # Skip if file already exists
-            if os.path.exists(filepath):
-                continue
-                
-            # Construct URL (Lichess uses first letter of piece name, capitalized for white)
-            piece_char = piece[0].upper() if color == 'white' else piece[0].lower()
-            url = f"{base_url}{piece_char}.svg"
+        # Construct URL (Lichess uses the piece symbol, capitalized for white)
+        url = f"{base_url}{symbol}.svg"
+        
+        try:
+            response = session.get(url)
+            response.raise_for_status()
             
-            try:
-                response = requests.get(url)
-                response.raise_for_status()
-                
-                with open(filepath, 'wb') as f:
-                    f.write(response.content)
-                logging.info(f"Downloaded {filename}")
-                
-            except requests.RequestException as e:
-                logging.error(f"Failed to download {filename}: {str(e)}")
-                raise
+            with open(filepath, 'wb') as f:
+                f.write(response.content)
+            logging.info(f"Downloaded {filename}")
+            
+        except requests.RequestException as e:
+            logging.error(f"Failed to download {filename}: {str(e)}")
+            raise
+    
+    # Fetch all pieces concurrently over a shared connection pool
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=6) as executor:
+        list(executor.map(lambda sp: _fetch(session, *sp), PIECE_FILES))
+
+def blit_batch(surface, blit_sequence):
+    """Blit a sequence of (source, dest) pairs in a single call."""
+    # fblits is only available in pygame-ce; fall back to blits elsewhere
+    if hasattr(surface, "fblits"):
+        surface.fblits(blit_sequence)
+    else:
+        surface.blits(blit_sequence, doreturn=0)
 
 class ChessGame:
     """Main game controller class with error handling."""
@@ -66,11 +102,23 @@ class ChessGame:
         self.game.headers["White"] = "Player"
         self.game.headers["Black"] = "AI"
         self.node = self.game
+        self._game_path = f"{GAMES_DIR}/game_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pgn"
+        self._pgn_file = None  # Movetext log appended to on every move
+        self._game_saved = False  # Set once save_game has written the full PGN
         self.selected_square = None
         self.dragging = False
         self.drag_piece = None
         self.drag_pos = None
-        self.legal_moves = set()
+        self.legal_dest = {}  # to_square | promotion << 6 -> Move for the selected piece
+        self._highlight_targets = []  # (highlight surface, position) blits for the selected piece
+        self._legal_cache = None  # Cleared by make_move whenever the position changes
+        self._needs_redraw = True  # Only repaint frames when something changed
+        self._full_redraw = True  # Board state changed, so flip the whole display
+        self._drag_rect = None  # Screen area covered by the dragged piece this frame
+        self._prev_drag_rect = None
+        # Top-left screen position of every square, indexed by square (0-63)
+        self._square_xy = tuple((chess.square_file(s) * SQUARE_SIZE, (7 - chess.square_rank(s)) * SQUARE_SIZE)
+                                for s in chess.SQUARES)
         
         # Download pieces if needed
         download_chess_pieces()
@@ -86,6 +134,13 @@ class ChessGame:
             # Create a transparent surface for highlights
             self.highlight_surface = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA)
             pygame.draw.rect(self.highlight_surface, HIGHLIGHT, (0, 0, SQUARE_SIZE, SQUARE_SIZE))
+            self.highlight_surface = self.highlight_surface.convert_alpha()
+            # Pre-render the static checkered background once
+            self.board_surface = pygame.Surface((WIDTH, HEIGHT)).convert()
+            for row in range(8):
+                for col in range(8):
+                    color = WHITE if (row + col) % 2 == 0 else BROWN
+                    pygame.draw.rect(self.board_surface, color, (col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE))
         except pygame.error as e:
             logging.critical(f"Pygame initialization failed: {str(e)}")
             raise
@@ -94,40 +149,59 @@ class ChessGame:
         """Load chess piece images."""
         self.pieces = {}
         piece_size = int(SQUARE_SIZE * 0.8)  # Slightly smaller than square size
+        self._piece_offset = (SQUARE_SIZE - piece_size) // 2  # Centers a piece in its square
         
         try:
-            # Ensure assets directory exists
-            assets_dir = os.path.join(os.path.dirname(__file__), "assets")
-            if not os.path.exists(assets_dir):
-                os.makedirs(assets_dir)
-            
-            # Map of piece symbols to their image filenames
-            piece_files = {
-                'p': 'black_pawn.png', 'r': 'black_rook.png', 'n': 'black_knight.png',
-                'b': 'black_bishop.png', 'q': 'black_queen.png', 'k': 'black_king.png',
-                'P': 'white_pawn.png', 'R': 'white_rook.png', 'N': 'white_knight.png',
-                'B': 'white_bishop.png', 'Q': 'white_queen.png', 'K': 'white_king.png'
-            }
-            
-            # Load and scale each piece image
-            for symbol, filename in piece_files.items():
-                filepath = os.path.join(assets_dir, filename)
-                if os.path.exists(filepath):
-                    image = pygame.image.load(filepath)
-                    self.pieces[symbol] = pygame.transform.smoothscale(image, (piece_size, piece_size))
-                else:
-                    logging.error(f"Missing piece image: {filepath}")
-                    raise FileNotFoundError(f"Missing piece image: {filepath}")
+            # Load each piece at display size, rendering it to a cached PNG on first run
+            for symbol, filepath in PIECE_FILES:
+                cached_path = f"{os.path.splitext(filepath)[0]}_{piece_size}px.png"
+                source_exists = os.path.exists(filepath)
+                # Re-render when the source image is newer than its cached copy
+                cache_fresh = os.path.exists(cached_path) and (
+                    not source_exists or os.path.getmtime(cached_path) >= os.path.getmtime(filepath))
+                if not cache_fresh:
+                    if not source_exists:
+                        logging.error(f"Missing piece image: {filepath}")
+                        raise FileNotFoundError(f"Missing piece image: {filepath}")
+                    try:
+                        self._render_piece(filepath, cached_path, piece_size)
+                    except (OSError, pygame.error) as e:
+                        # The cache is only an optimisation, so scale in memory if it can't be written
+                        logging.error(f"Failed to cache piece image {cached_path}: {str(e)}")
+                        image = pygame.image.load(filepath)
+                        self.pieces[symbol] = pygame.transform.smoothscale(image, (piece_size, piece_size)).convert_alpha(self.screen)
+                        continue
+                # Match the display pixel format so blits skip per-frame conversion
+                self.pieces[symbol] = pygame.image.load(cached_path).convert_alpha(self.screen)
                     
         except (pygame.error, FileNotFoundError) as e:
             logging.critical(f"Failed to load piece images: {str(e)}")
             raise
 
-    def square_to_pos(self, square):
-        """Convert chess square (0-63) to screen position."""
-        file_idx = chess.square_file(square)
-        rank_idx = 7 - chess.square_rank(square)
-        return (file_idx * SQUARE_SIZE, rank_idx * SQUARE_SIZE)
+    @staticmethod
+    def _render_piece(filepath, cached_path, piece_size):
+        """Render a piece image at piece_size and cache it as a PNG."""
+        with open(filepath, 'rb') as f:
+            data = f.read()
+        
+        # Render to a temp file first so an interrupted run never leaves a truncated cache
+        tmp_path = f"{os.path.splitext(cached_path)[0]}.tmp.png"
+        rendered = False
+        
+        # Lichess serves SVGs, so rasterize them directly at the target size when possible
+        if cairosvg is not None and data.lstrip().startswith((b"<svg", b"<?xml")):
+            try:
+                cairosvg.svg2png(bytestring=data, write_to=tmp_path,
+                                 output_width=piece_size, output_height=piece_size)
+                rendered = True
+            except Exception as e:
+                logging.error(f"Failed to rasterize {filepath} with cairosvg, falling back to smoothscale: {str(e)}")
+        
+        if not rendered:
+            image = pygame.image.load(filepath)
+            pygame.image.save(pygame.transform.smoothscale(image, (piece_size, piece_size)), tmp_path)
+        os.replace(tmp_path, cached_path)
+        logging.info(f"Cached {piece_size}px piece image: {cached_path}")
 
     def pos_to_square(self, pos):
         """Convert screen position to chess square (0-63)."""
@@ -135,109 +209,143 @@ class ChessGame:
         file_idx = x // SQUARE_SIZE
         rank_idx = 7 - (y // SQUARE_SIZE)
         if 0 <= file_idx <= 7 and 0 <= rank_idx <= 7:
-            return chess.square(file_idx, rank_idx)
+            return (rank_idx << 3) | file_idx
         return None
 
     def draw_board(self):
         """Draw the chessboard with move highlights."""
-        for row in range(8):
-            for col in range(8):
-                color = WHITE if (row + col) % 2 == 0 else BROWN
-                pygame.draw.rect(self.screen, color, (col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE))
+        self.screen.blit(self.board_surface, (0, 0))
         
         # Highlight legal moves
         if self.selected_square is not None:
-            for move in self.legal_moves:
-                if move.from_square == self.selected_square:
-                    pos = self.square_to_pos(move.to_square)
-                    self.screen.blit(self.highlight_surface, pos)
+            blit_batch(self.screen, self._highlight_targets)
 
     def draw_pieces(self):
         """Render chess pieces on the board using images."""
-        # Draw all pieces except the dragged one
-        for square in chess.SQUARES:
-            piece = self.board.piece_at(square)
-            if piece is not None:
-                # Convert piece to character (e.g., 'P' for white pawn, 'p' for black pawn)
-                piece_char = piece.symbol()
-                
-                if not (self.dragging and square == self.selected_square):
-                    piece_img = self.pieces[piece_char]
-                    # Get the file (column) and rank (row) from the square
-                    file_idx = chess.square_file(square)
-                    rank_idx = 7 - chess.square_rank(square)  # Flip rank since we draw from top
-                    
-                    # Center the piece in the square
-                    x = file_idx * SQUARE_SIZE + (SQUARE_SIZE - piece_img.get_width()) // 2
-                    y = rank_idx * SQUARE_SIZE + (SQUARE_SIZE - piece_img.get_height()) // 2
-                    self.screen.blit(piece_img, (x, y))
+        # piece_map() only holds occupied squares and is a fresh dict, so the
+        # dragged piece can simply be popped before batching the rest
+        piece_map = self.board.piece_map()
+        if self.dragging:
+            piece_map.pop(self.selected_square, None)
+        
+        offset = self._piece_offset
+        square_xy = self._square_xy
+        blit_list = []
+        for square, piece in piece_map.items():
+            x, y = square_xy[square]
+            blit_list.append((self.pieces[piece.symbol()], (x + offset, y + offset)))
+        blit_batch(self.screen, blit_list)
         
         # Draw dragged piece last
+        self._drag_rect = None
         if self.dragging and self.drag_piece in self.pieces:
             piece_img = self.pieces[self.drag_piece]
             # Center the piece on the mouse cursor
             x = self.drag_pos[0] - piece_img.get_width() // 2
             y = self.drag_pos[1] - piece_img.get_height() // 2
-            self.screen.blit(piece_img, (x, y))
+            self._drag_rect = self.screen.blit(piece_img, (x, y))
 
     def handle_click(self, pos):
         """Handle mouse click events for piece selection."""
         square = self.pos_to_square(pos)
         if square is None:
             return
+        self._needs_redraw = self._full_redraw = True
         
         if self.selected_square is None:
             piece = self.board.piece_at(square)
             if piece and piece.color == (self.board.turn == chess.WHITE):
                 self.selected_square = square
-                self.legal_moves = set(move for move in self.board.legal_moves 
-                                    if move.from_square == square)
+                self.legal_dest = {move.to_square | (move.promotion or 0) << 6: move
+                                   for move in self._get_legal_moves()[0]
+                                   if move.from_square == square}
+                # Promotions share a destination, so highlight each square once
+                self._highlight_targets = [(self.highlight_surface, self._square_xy[to_square])
+                                           for to_square in {move.to_square for move in self.legal_dest.values()}]
                 self.drag_piece = str(piece)
                 self.dragging = True
-                self.drag_pos = pygame.mouse.get_pos()
+                self.drag_pos = pos
         else:
-            move = chess.Move(self.selected_square, square)
-            if move in self.legal_moves:
+            # Plain moves are keyed by destination; promotions default to a queen
+            move = self.legal_dest.get(square) or self.legal_dest.get(square | chess.QUEEN << 6)
+            if move:
                 self.make_move(move)
             self.selected_square = None
-            self.legal_moves.clear()
+            self.legal_dest = {}
+            self._highlight_targets = []
             self.dragging = False
             self.drag_piece = None
 
     def make_move(self, move):
         """Make a move on the board and update game state."""
+        # SAN has to be computed from the position before the move
+        ply = len(self.board.move_stack)
+        san = self.board.san(move)
         self.board.push(move)
+        self._legal_cache = None
+        self._needs_redraw = self._full_redraw = True
         self.node = self.node.add_variation(move)
-        self.save_game()  # Auto-save after each move
+        self._log_move(ply, san)
+
+    def _log_move(self, ply, san):
+        """Append a single move to the game's PGN movetext log."""
+        # Never reopen the log over the complete PGN written by save_game
+        if self._game_saved:
+            return
+        try:
+            if self._pgn_file is None:
+                self._pgn_file = open(self._game_path, "w")
+            # White's moves carry the move number; start a new line after each full move
+            if ply % 2 == 0:
+                self._pgn_file.write(f"{ply // 2 + 1}. {san} ")
+            else:
+                self._pgn_file.write(f"{san}\n")
+            self._pgn_file.flush()
+        except IOError as e:
+            logging.error(f"Failed to log move: {str(e)}")
+
+    def _get_legal_moves(self):
+        """Return the legal moves and a UCI -> move map, cached per position."""
+        if self._legal_cache is None:
+            moves = list(self.board.legal_moves)
+            self._legal_cache = (moves, {move.uci(): move for move in moves})
+        return self._legal_cache
 
     def save_game(self):
-        """Save the game in PGN format."""
+        """Save the complete game in PGN format, replacing the movetext log."""
         try:
-            os.makedirs("games", exist_ok=True)
-            filename = f"games/game_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pgn"
-            with open(filename, "w") as f:
+            if self._pgn_file is not None:
+                self._pgn_file.close()
+                self._pgn_file = None
+            # Write to a temp file first so an interrupted save never truncates the game
+            tmp_path = f"{self._game_path}.tmp"
+            with open(tmp_path, "w") as f:
                 print(self.game, file=f, end="\n\n")
-            logging.info(f"Game saved to {filename}")
+            os.replace(tmp_path, self._game_path)
+            self._game_saved = True
+            logging.info(f"Game saved to {self._game_path}")
         except IOError as e:
             logging.error(f"Failed to save game: {str(e)}")
 
     @staticmethod
-    def get_ai_move(fen: str) -> str | None:
+    def get_ai_move(board: chess.Board, legal_moves=None) -> chess.Move | None:
         """Get AI move from LLM API with error handling and move validation."""
         url = "http://localhost:11434/api/generate"
-        headers = {"Content-Type": "application/json"}
+        fen = board.fen()
         
-        # Create a temporary board to get legal moves
-        board = chess.Board(fen)
-        legal_moves = [move.uci() for move in board.legal_moves]
+        # Map UCI strings to moves unless the caller already has them
+        if legal_moves is None:
+            legal_moves = {move.uci(): move for move in board.legal_moves}
+        # Sorted list keeps the prompt stable; the map is used for validation
+        legal_moves_list = sorted(legal_moves)
         
         # If no legal moves, return None
-        if not legal_moves:
+        if not legal_moves_list:
             return None
             
         prompt = (
             f"Current chess position FEN: {fen}\n\n"
-            f"Legal moves in UCI format: {', '.join(legal_moves)}\n\n"
+            f"Legal moves in UCI format: {', '.join(legal_moves_list)}\n\n"
             "You are a chess engine. Choose one move from the legal moves list above.\n"
             "Rules:\n"
             "1. Respond ONLY with a single UCI move from the legal moves list\n"
@@ -250,34 +358,58 @@ class ChessGame:
         payload = {
             "model": "llama3.2",
             "prompt": prompt,
-            "stream": False,
+            "stream": True,
             "temperature": 0.1
         }
         
         try:
-            response = requests.post(
-                url,
-                headers=headers,
-                data=json.dumps(payload),
-                timeout=10
-            )
-            if response.status_code != 200:
-                logging.error(f"API request failed with status code: {response.status_code}")
-                return None
+            with _OLLAMA_SESSION.post(url, json=payload, timeout=10, stream=True) as response:
+                if response.status_code != 200:
+                    logging.error(f"API request failed with status code: {response.status_code}")
+                    return None
                 
-            # Get the response and clean it
-            move = response.json().get("response", "").strip().lower()
-            # Extract just the first word (in case of extra text)
-            move = move.split()[0]
-            
-            logging.info(f"Raw AI response: {move}")
+                # Accumulate streamed tokens and stop as soon as a legal move appears
+                text = ""
+                checked = 0
+                ai_move = None
+                server_done = False
+                lines = response.iter_lines()
+                for tokens_read, line in enumerate(lines, 1):
+                    if not line:
+                        continue
+                    chunk = _json_loads(line)
+                    text += chunk.get("response", "").lower()
+                    server_done = chunk.get("done", False)
+                    done = server_done or tokens_read >= AI_MAX_TOKENS
+                    
+                    words = text.split()
+                    # The last word may still be growing until whitespace or the end of the stream follows it
+                    if words and not done and not text[-1].isspace():
+                        words.pop()
+                    for word in words[checked:]:
+                        move = word.strip(".,;:!'\"`*")
+                        if move in legal_moves:
+                            ai_move = legal_moves[move]
+                            break
+                    checked = len(words)
+                    
+                    if ai_move is not None or done:
+                        break
+                
+                # Once Ollama has sent its final chunk, finish reading the body so the
+                # keep-alive connection goes back to the pool. Stopping while the model
+                # is still generating closes the connection instead, which is cheaper
+                # than waiting for the rest of the completion.
+                if server_done:
+                    for _ in lines:
+                        pass
             
-            # Validate that the move is in the legal moves list
-            if move not in legal_moves:
-                logging.error(f"AI suggested move {move} is not in legal moves list: {legal_moves}")
+            if ai_move is None:
+                logging.error(f"AI response {text.strip()!r} contains no move from legal moves list: {legal_moves_list}")
                 return None
-                
-            return move
+            
+            logging.info(f"Raw AI response: {text.strip()}")
+            return ai_move
             
         except (requests.RequestException, KeyError, json.JSONDecodeError) as e:
             logging.error(f"AI move request failed: {str(e)}")
@@ -286,16 +418,12 @@ class ChessGame:
     def _clear_games_folder(self):
         """Clear all PGN files from the games folder."""
         try:
-            games_dir = os.path.join(os.path.dirname(__file__), "games")
-            if os.path.exists(games_dir):
-                for file in os.listdir(games_dir):
-                    if file.endswith('.pgn'):
-                        file_path = os.path.join(games_dir, file)
-                        try:
-                            os.remove(file_path)
-                            logging.info(f"Removed previous game file: {file}")
-                        except OSError as e:
-                            logging.error(f"Error removing file {file}: {str(e)}")
+            for path in Path(GAMES_DIR).glob("*.pgn"):
+                try:
+                    path.unlink()
+                    logging.info(f"Removed previous game file: {path.name}")
+                except OSError as e:
+                    logging.error(f"Error removing file {path.name}: {str(e)}")
         except Exception as e:
             logging.error(f"Error clearing games folder: {str(e)}")
 
@@ -307,14 +435,23 @@ class ChessGame:
         
         logging.info('Starting the game...')
         while running:
-            self.screen.fill((0, 0, 0))
-            self.draw_board()
-            self.draw_pieces()
-            pygame.display.flip()
+            if self._needs_redraw:
+                self.screen.fill((0, 0, 0))
+                self.draw_board()
+                self.draw_pieces()
+                if self._full_redraw or self._drag_rect is None or self._prev_drag_rect is None:
+                    pygame.display.flip()
+                else:
+                    # Only the areas under the old and new drag positions changed
+                    pygame.display.update([self._prev_drag_rect, self._drag_rect])
+                self._prev_drag_rect = self._drag_rect
+                self._needs_redraw = self._full_redraw = False
             
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
+                    self.save_game()
                     running = False
+                    break
                 elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                     self.handle_click(event.pos)
                 elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
@@ -322,16 +459,25 @@ class ChessGame:
                         self.handle_click(event.pos)
                 elif event.type == pygame.MOUSEMOTION and self.dragging:
                     self.drag_pos = event.pos
+                    self._needs_redraw = True
+                elif event.type == pygame.VIDEOEXPOSE:
+                    self._needs_redraw = self._full_redraw = True
+            
+            # Nothing may move once the game has been saved on quit
+            if not running:
+                break
             
             if self.board.turn == chess.BLACK and not self.board.is_game_over():
-                ai_move = self.get_ai_move(self.board.fen())
+                legal_moves = self._get_legal_moves()[1]
+                ai_move = self.get_ai_move(self.board, legal_moves)
                 print("Board FEN:", self.board.fen())
-                print("Legal moves:", self.board.legal_moves)
+                print("Legal moves:", ", ".join(legal_moves))
                 print("Ai suggested move:", ai_move)
-                if ai_move and chess.Move.from_uci(ai_move) in self.board.legal_moves:
-                    self.make_move(chess.Move.from_uci(ai_move))
+                if ai_move:
+                    self.make_move(ai_move)
                 else:
                     logging.error("AI returned an invalid move. Ending game.")
+                    self.save_game()
                     break
             
             if self.board.is_game_over():
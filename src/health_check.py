@@ -1,16 +1,25 @@
 
 import requests
 
+# Shared session so repeated checks reuse the same connection
+_SESSION = requests.Session()
+TIMEOUT = 2  # Seconds before a stalled endpoint is reported as down
+HEAD_UNSUPPORTED = (404, 405, 501)  # Statuses servers use when HEAD is not supported
+
 class healthCheck:
     def __init__(self, url):
         self.url = url
 
     def check(self):
         try:
-            response = requests.get(self.url)
-            if response.status_code == 200:
-                return True
-            else:
-                return False
+            # HEAD avoids downloading the body just to read the status code
+            response = _SESSION.head(self.url, timeout=TIMEOUT, allow_redirects=True)
+            if response.status_code in HEAD_UNSUPPORTED:
+                # The endpoint rejects HEAD (Ollama answers 404 on its POST-only /api routes),
+                # so retry with GET and close it without reading the body
+                get_response = _SESSION.get(self.url, timeout=TIMEOUT, stream=True)
+                get_response.close()
+                return get_response.status_code == 200
+            return response.status_code == 200
         except requests.exceptions.RequestException:
             return False
@@ -1,9 +1,19 @@
 import requests
+from requests.adapters import HTTPAdapter
 import json
 
+try:
+    import orjson  # Optional: faster JSON decoding
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Keep-alive session reused across queries to the same Ollama host
+_OLLAMA_SESSION = requests.Session()
+_OLLAMA_SESSION.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+
 def query_ollama(model: str, prompt: str):
     url = "http://localhost:11434/api/generate"
-    headers = {"Content-Type": "application/json"}
     
     payload = {
         "model": model,
@@ -11,10 +21,10 @@ def query_ollama(model: str, prompt: str):
         "stream": False
     }
     
-    response = requests.post(url, headers=headers, data=json.dumps(payload))
+    response = _OLLAMA_SESSION.post(url, json=payload)
     
     if response.status_code == 200:
-        return response.json().get("response", "No response received")
+        return _json_loads(response.content).get("response", "No response received")
     else:
         return f"Error: {response.status_code}, {response.text}"
 